@@ -1,34 +1,32 @@
 #!/usr/bin/env python3
+import os
 import pandas as pd
-from nba_api.stats.endpoints import leaguegamefinder
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+from nba_cache import load_games
+
 def main():
     print("Fetching 2025-26 season data...")
-    finder = leaguegamefinder.LeagueGameFinder(
-        season_nullable='2025-26', 
-        league_id_nullable='00', 
-        season_type_nullable='Regular Season'
-    )
-    df = finder.get_data_frames()[0]
+    df = load_games('2025-26', 'Regular Season', columns=['TEAM_ABBREVIATION', 'PF', 'PLUS_MINUS'])
     
     # 1. Identify "Close Games" (Final Score Margin <= 5)
     # Plus/Minus in LeagueGameFinder is from the perspective of the team in that row.
     # So abs(PLUS_MINUS) <= 5 means the game ended within 5 points.
-    close_games_df = df[df['PLUS_MINUS'].abs() <= 5].copy()
+    close_mask = df['PLUS_MINUS'].abs() <= 5
     
-    if close_games_df.empty:
+    if not close_mask.any():
         print("No close games found for 2025-26 yet.")
         return
 
     # 2. Aggregate PF (Personal Fouls) per team in these close games
-    stats = close_games_df.groupby('TEAM_ABBREVIATION').agg({
-        'PF': ['mean', 'count', 'max'],
-        'PLUS_MINUS': 'mean'
-    })
-    
-    # Flatten columns
-    stats.columns = ['avg_fouls', 'game_count', 'max_fouls', 'avg_margin']
+    # Named aggregation: flat column names, no intermediate copy of the filtered frame
+    stats = df.loc[close_mask].groupby('TEAM_ABBREVIATION', observed=True).agg(
+        avg_fouls=('PF', 'mean'),
+        game_count=('PF', 'count'),
+        max_fouls=('PF', 'max'),
+        avg_margin=('PLUS_MINUS', 'mean')
+    )
     
     # Sort by highest average fouls
     stats = stats.sort_values(by='avg_fouls', ascending=False)
@@ -1,6 +1,16 @@
 import requests
 import json
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared across the period fetches so the TCP+TLS handshake is paid once
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://stats.nba.com/",
+    "x-nba-stats-origin": "stats",
+    "x-nba-stats-token": "true",
+})
 
 def get_nop_stats(gid, q):
     url = "https://stats.nba.com/stats/boxscoreadvancedv2"
@@ -12,14 +22,8 @@ def get_nop_stats(gid, q):
         "EndRange": 0,
         "RangeType": 0
     }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Referer": "https://stats.nba.com/",
-        "x-nba-stats-origin": "stats",
-        "x-nba-stats-token": "true",
-    }
     
-    resp = requests.get(url, params=params, headers=headers, timeout=30)
+    resp = SESSION.get(url, params=params, timeout=30)
     data = resp.json()
     
     # Manually parse resultSets
@@ -52,9 +56,12 @@ def get_nop_stats(gid, q):
 
 gid = "0022500366"
 print(f"Analyzing quarterly performance for Pelicans (NOP) in game {gid}:")
+periods = range(1, 5)
+with ThreadPoolExecutor(max_workers=len(periods)) as ex:
+    period_stats = list(ex.map(lambda q: get_nop_stats(gid, q), periods))
+
 all_stats = []
-for q in range(1, 5):
-    res = get_nop_stats(gid, q)
+for q, res in zip(periods, period_stats):
     if res:
         all_stats.append(res)
     else:
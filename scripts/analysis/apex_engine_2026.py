@@ -1,6 +1,13 @@
+import functools
+
 import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; simulate() falls back to NumPy.
+    njit = None
+
 # ==============================================================================
 # MODULE 1: THE CONFIGURATION (YOUR "BEST ENHANCE" WEIGHTS)
 # ==============================================================================
@@ -25,6 +32,65 @@ class ModelConfig:
     HEAVE_PROB = 0.045  # 4.5% make rate on "Free Heaves" (High Variance)
     HOME_COURT = 2.6
 
+# ==============================================================================
+# MODULE 1.5: THE KERNEL (JIT-COMPILED MONTE CARLO)
+# ==============================================================================
+KERNEL_CHUNKS = 64  # Fixed work split: each chunk reseeds, so results don't depend on thread scheduling
+# The two backends draw different random streams: a seed reproduces a fair line only on the same backend
+DEFAULT_BACKEND = "numba" if njit is not None else "numpy"
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _simulate_kernel(h_rtg, a_rtg, pace, hc, heave_p, iterations, seed):
+        """
+        Compiled once per process (and cached on disk), then reused for every game.
+        Returns: Median spread (Negative = Home Win)
+        """
+        h_base = (pace/2) * (1 + h_rtg/100) + hc
+        a_base = (pace/2) * (1 + a_rtg/100)
+        results = np.empty(iterations)
+        chunk = (iterations + KERNEL_CHUNKS - 1) // KERNEL_CHUNKS
+        for c in prange(KERNEL_CHUNKS):
+            np.random.seed(seed * KERNEL_CHUNKS + c)
+            for i in range(c * chunk, min((c + 1) * chunk, iterations)):
+                h_score = h_base + np.random.normal(0, 11) + np.random.binomial(3, heave_p) * 3
+                a_score = a_base + np.random.normal(0, 11) + np.random.binomial(3, heave_p) * 3
+                results[i] = a_score - h_score
+        return np.median(results)
+else:
+    _simulate_kernel = None
+
+@functools.lru_cache(maxsize=1024)
+def _simulate_cached(h_rtg, a_rtg, pace, hc, heave_p, iterations, seed, backend):
+    """
+    Memoized fair line. Every input that changes the result is part of the key
+    (including the backend, whose random stream differs), so repeated sensitivity
+    runs on the same matchup reuse one simulation.
+    """
+    if backend == "numba":
+        if _simulate_kernel is None:
+            raise ValueError("backend='numba' requires Numba to be installed")
+        return _simulate_kernel(h_rtg, a_rtg, pace, hc, heave_p, iterations, seed)
+
+    # NumPy backend (the default when Numba is not installed)
+    rng = np.random.default_rng(seed)
+
+    # Base Score (Pace * Rating) + Noise (Shooting Variance)
+    # Column 0 = Home, Column 1 = Away; one row per simulated game.
+    base = (pace/2) * (1 + np.array([h_rtg, a_rtg])/100)
+    noise = rng.standard_normal((iterations, 2)) * 11
+
+    # THE HEAVE RULE (Variance Injection)
+    # 3 random end-of-quarter heaves per game (New 2026 Rule)
+    heaves = rng.binomial(3, heave_p, (iterations, 2)) * 3
+
+    scores = base + noise + heaves
+    scores[:, 0] += hc
+
+    results = scores[:, 1] - scores[:, 0] # Spread (Negative = Home Win)
+
+    return np.median(results, overwrite_input=True) # In-place quickselect; results is scratch
+
 # ==============================================================================
 # MODULE 2: THE CALCULATOR (PHYSICS + SITUATION)
 # ==============================================================================
@@ -63,34 +129,26 @@ class GameEngine:
         # C. ATS MOMENTUM (Market Lag)
         if team['ats_pct'] >= self.cfg.ATS_THRESHOLD:
             rating += self.cfg.ATS_BONUS_POINTS
-            notes.append(f"ATS WAGON (+{self.cfg.ATS_BONUS_POINTS})")
+            notes.append("ATS WAGON") # Exact tag: MarketReader matches flags by set membership
+            notes.append(f"ATS Bonus (+{self.cfg.ATS_BONUS_POINTS})")
             
         return rating, notes
 
-    def simulate(self, home, away, iterations=10000):
+    def simulate(self, home, away, iterations=10000, seed=0, backend=DEFAULT_BACKEND):
         """
         Runs Monte Carlo sim including 2026 'Heave' Variance.
+        Deterministic for a given (seed, backend): Numba and NumPy draw different
+        random streams, so pass backend="numpy" to reproduce a fair line on a
+        machine without Numba. Identical inputs are served from cache.
         """
         h_rtg, h_notes = self.get_effective_rating(home)
         a_rtg, a_notes = self.get_effective_rating(away)
         
-        results = []
-        
-        for _ in range(iterations):
-            # Base Score (Pace * Rating) + Noise (Shooting Variance)
-            h_score = (self.cfg.AVG_PACE/2) * (1 + h_rtg/100) + np.random.normal(0, 11)
-            a_score = (self.cfg.AVG_PACE/2) * (1 + a_rtg/100) + np.random.normal(0, 11)
-            
-            # THE HEAVE RULE (Variance Injection)
-            # 3 random end-of-quarter heaves per game (New 2026 Rule)
-            h_score += np.random.binomial(3, self.cfg.HEAVE_PROB) * 3
-            a_score += np.random.binomial(3, self.cfg.HEAVE_PROB) * 3
-            
-            h_score += self.cfg.HOME_COURT
-            
-            results.append(a_score - h_score) # Spread (Negative = Home Win)
-
-        fair_line = np.percentile(results, 50) # Median
+        fair_line = _simulate_cached(
+            round(float(h_rtg), 3), round(float(a_rtg), 3),
+            self.cfg.AVG_PACE, self.cfg.HOME_COURT, self.cfg.HEAVE_PROB,
+            iterations, seed, backend
+        )
         return round(fair_line, 1), h_notes, a_notes
 
 # ==============================================================================
@@ -107,6 +165,7 @@ class MarketReader:
         public_price = fair_line + recency_bias
         
         delta_math = vegas - fair_line
+        flags = frozenset(h_notes) | frozenset(a_notes)
         
         story = "Standard Market"
         action = "PASS"
@@ -116,7 +175,7 @@ class MarketReader:
 
         # SCENARIO 1: "THE STRUCTURAL EDGE" (Fatigue Mismatch)
         # Our model heavily penalized the tired team ("APRON CRUSH"), creating a huge edge.
-        if abs(delta_math) > 4.0 and ("APRON FATIGUE CRUSH" in str(h_notes) or "APRON FATIGUE CRUSH" in str(a_notes)):
+        if abs(delta_math) > 4.0 and "APRON FATIGUE CRUSH" in flags:
             story = "STRUCTURAL MISMATCH (Apron/Fatigue)"
             action = "BET MODEL (Fade the Tired Team)"
             size = "2 UNITS (Hammer)"
@@ -137,13 +196,65 @@ class MarketReader:
             
         # SCENARIO 4: "ATS WAGON"
         # Pure trend following backed by math.
-        elif ("ATS WAGON" in str(h_notes) or "ATS WAGON" in str(a_notes)) and (vegas - fair_line) * (1 if fair_line < 0 else -1) > 0:
+        elif "ATS WAGON" in flags and (vegas - fair_line) * (1 if fair_line < 0 else -1) > 0:
             story = "MARKET LAG (Ride the Trend)"
             action = "BET MODEL (Don't step in front of train)"
             size = "1 Unit"
 
         return story, action, size
 
+    @staticmethod
+    def slate_row(game_data, fair_line, h_notes, a_notes):
+        """
+        Flattens one game (market + model output) into a row for analyze_slate().
+        """
+        flags = frozenset(h_notes) | frozenset(a_notes)
+        return {
+            **game_data,
+            'fair_line': fair_line,
+            'apron_crush': "APRON FATIGUE CRUSH" in flags,
+            'ats_wagon': "ATS WAGON" in flags,
+        }
+
+    def analyze_slate(self, slate):
+        """
+        Vectorized analyze() for a whole night of games (one row per game, see slate_row).
+        Returns: DataFrame with story / action / size, aligned to slate.index
+        """
+        vegas = slate['vegas_line'].to_numpy(dtype=float)
+        fair_line = slate['fair_line'].to_numpy(dtype=float)
+        ticket_pct = slate['ticket_pct'].to_numpy(dtype=float)
+        public_price = fair_line + slate['last_5_diff'].to_numpy(dtype=float) * 0.35
+        delta_math = vegas - fair_line
+        abs_delta = np.abs(delta_math)
+
+        # Same four scenarios as analyze(); np.select takes the first match, like the elif chain
+        conditions = [
+            (abs_delta > 4.0) & slate['apron_crush'].to_numpy(dtype=bool),
+            (ticket_pct > 75) & (np.abs(vegas - public_price) > 3.0) & (abs_delta < 1.0),
+            (abs_delta > 2.5) & ((slate['home_inj_val'].to_numpy(dtype=float) > 4) | (slate['away_inj_val'].to_numpy(dtype=float) > 4)),
+            slate['ats_wagon'].to_numpy(dtype=bool) & (delta_math * np.where(fair_line < 0, 1, -1) > 0),
+        ]
+        fade_public = ("FADE PUBLIC (Bet " + slate['underdog'].astype(str) + ")").to_numpy(dtype=object)
+
+        story = np.select(conditions, [
+            "STRUCTURAL MISMATCH (Apron/Fatigue)",
+            "THE STINK (Vegas Trap)",
+            "INJURY OVERREACTION (Ewing Theory)",
+            "MARKET LAG (Ride the Trend)",
+        ], default="Standard Market")
+        action = np.select(conditions, [
+            "BET MODEL (Fade the Tired Team)",
+            fade_public,
+            "BET MODEL (Take the Points)",
+            "BET MODEL (Don't step in front of train)",
+        ], default="PASS")
+        size = np.select(conditions, [
+            "2 UNITS (Hammer)", "1.5 Units", "1 Unit", "1 Unit",
+        ], default="1 Unit")
+
+        return pd.DataFrame({'story': story, 'action': action, 'size': size}, index=slate.index)
+
 # ==============================================================================
 # EXECUTION: THE 2026 WAR ROOM
 # ==============================================================================
@@ -6,34 +6,52 @@ Method: Q4 Blowout vs Q4 Close Baseline (avoids baseline contamination)
 
 Production Features:
 - Manifest Caching: Tracks 'SKIP' games so they aren't rescanned.
-- Incremental Persistence: Saves every 10 games to prevent data loss on crash.
-- Strict Deduplication: Checks (game_id, team, game_state, team_state) to prevent partial data corruption.
+- Incremental Persistence: Saves every 100 games to prevent data loss on crash
+  (one Snappy Parquet part file per flush; the dataset directory reads back as one table).
+- Strict Deduplication: Checks (game_id, team, game_state, team_state) to prevent partial data corruption
+  (keys are folded into one uint64 fingerprint each).
 - Foul Filtering: Removes intentional foul-fests from the Close-Game Baseline.
-- Adaptive Delays: Random jitter to evade NBA API rate limiting.
+- Bulk Line Scores: Margins entering Q4 for the whole season come from three
+  season-wide TeamGameLogs pulls (Periods 1-3) instead of one request per game.
+- Concurrent Fetching: Games missing from the bulk pull fall back to per-game line
+  scores via aiohttp under a bounded semaphore, with Retry-After aware backoff.
+- Response Cache: Raw per-game responses are kept under --cache-dir (zstd-compressed
+  when zstandard is installed), so reruns skip games already fetched.
 """
 
 from __future__ import annotations
 import argparse
-import json
+import asyncio
+import functools
 import logging
 import os
 import sys
 import time
 import random
-import traceback
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import aiohttp
 import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import zstandard as zstd
+except ImportError:  # zstandard is optional; the response cache then stores plain JSON.
+    zstd = None
+
 from nba_api.stats.library.http import NBAStatsHTTP
 from nba_api.stats.endpoints import (
     leaguegamefinder,
-    boxscoresummaryv2,
     boxscoreadvancedv2,
+    teamgamelogs,
 )
 
 # ---------------- LOGGING ----------------
@@ -63,134 +81,234 @@ CLOSE_FTA_RATE_MAX = 0.35
 ENABLE_FOUL_FILTER = True
 
 # Rate Limiting
-SLEEP_SUMMARY = 2.0
-SLEEP_ADV = 2.0
-BATCH_SIZE = 10
-
-def human_delay(base: float):
-    """Adds 20-50% random jitter."""
-    time.sleep(base * random.uniform(1.0, 1.5))
-
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (np.integer, np.int64)): return int(obj)
-        if isinstance(obj, (np.floating, np.float64)): return float(obj)
-        if isinstance(obj, np.ndarray): return obj.tolist()
-        return super().default(obj)
+MAX_CONCURRENCY = 8         # In-flight requests to stats.nba.com
+MAX_ATTEMPTS = 6
+BACKOFF_START = 2.0         # Seconds; doubles per retry
+BACKOFF_CAP = 60.0
+BATCH_SIZE = 100
+
+# Persistence (Parquet dataset directories, explicit schemas: no dtype inference on reload)
+# Low-cardinality labels are dictionary-encoded on disk and load as pandas categoricals
+LABEL_TYPE = pa.dictionary(pa.int8(), pa.string())
+LABEL_COLUMNS = ("team", "game_state", "team_state")
+RAW_SCHEMA = pa.schema([
+    ("game_id", pa.string()), ("team", LABEL_TYPE),
+    ("game_state", LABEL_TYPE), ("team_state", LABEL_TYPE),
+    # Stats are rounded to 2-4 decimals already; float32 halves the bytes the priors pass reads
+    ("pace", pa.float32()), ("ortg", pa.float32()),
+    ("poss", pa.float32()), ("fta_rate", pa.float32()),
+])
+MANIFEST_SCHEMA = pa.schema([
+    ("game_id", pa.string()), ("status", pa.string()),
+    ("reason", pa.string()), ("processed_at_utc", pa.string()),
+])
+
+NBA_STATS_URL = "https://stats.nba.com/stats"
+NBA_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://stats.nba.com/",
+    "x-nba-stats-origin": "stats",
+    "x-nba-stats-token": "true",
+}
+
+def jittered(base: float) -> float:
+    """Adds 0-50% random jitter."""
+    return base * random.uniform(1.0, 1.5)
+
+def _with_data(ds: Dict[str, Any]) -> Dict[str, Any]:
+    # Map rowSet to data if missing, to satisfy different library versions
+    if "rowSet" in ds and "data" not in ds:
+        ds["data"] = ds["rowSet"]
+    return ds
+
+@functools.singledispatch
+def _normalize_data_sets(data_sets: Any) -> Any:
+    return data_sets
+
+@_normalize_data_sets.register
+def _parse_result_sets_list(data_sets: list) -> Dict[str, Any]:
+    # resultSets: convert to dict keyed by name
+    return {ds["name"]: _with_data(ds) for ds in data_sets if "name" in ds}
+
+@_normalize_data_sets.register
+def _parse_result_set_dict(data_sets: dict) -> Dict[str, Any]:
+    # Single resultSet and NOT the mapping expected: wrap it
+    if "name" in data_sets:
+        return {data_sets["name"]: _with_data(data_sets)}
+    return data_sets
+
+def _log_response_attrs(resp: Any) -> None:
+    for attr in dir(resp):
+        if "response" in attr.lower():
+            val = getattr(resp, attr)
+            logger.debug(f"Found attr {attr}: {type(val)}")
+            if isinstance(val, str):
+                logger.debug(f"  String content sample: {val[:500]}")
+            if hasattr(val, "_response"):
+                r = val._response
+                logger.debug(f"  Inner _response status: {r.status_code}")
+                logger.debug(f"  Inner _response url: {r.url}")
+                logger.debug(f"  Inner _response text: {r.text[:500]}")
 
 def patch_nba_api():
     """Monkey-patch nba_api to handle structural changes in response JSON."""
     from nba_api.stats.library.http import NBAStatsResponse
     original_get_data_sets = NBAStatsResponse.get_data_sets
 
-    def patched_get_data_sets(self):
+    def _fast_get_data_sets(self):
         try:
             raw_dict = self.get_dict()
-            data_sets = None
-            if "resultSet" in raw_dict:
-                data_sets = raw_dict["resultSet"]
-            elif "resultSets" in raw_dict:
-                data_sets = raw_dict["resultSets"]
-            else:
+            key = "resultSet" if "resultSet" in raw_dict else ("resultSets" if "resultSets" in raw_dict else None)
+            if key is None:
                 logger.warning(f"Structural mismatch. Keys found: {list(raw_dict.keys())}")
-                # Aggressive debug:
-                for attr in dir(self):
-                    if "response" in attr.lower():
-                        val = getattr(self, attr)
-                        logger.warning(f"Found attr {attr}: {type(val)}")
-                        if isinstance(val, str):
-                            logger.warning(f"  String content sample: {val[:500]}")
-                        if hasattr(val, "_response"):
-                            r = val._response
-                            logger.warning(f"  Inner _response status: {r.status_code}")
-                            logger.warning(f"  Inner _response url: {r.url}")
-                            logger.warning(f"  Inner _response text: {r.text[:500]}")
-            
-            if data_sets is None:
+                if logger.isEnabledFor(logging.DEBUG): _log_response_attrs(self)
+            if key is None or raw_dict[key] is None:
                 return original_get_data_sets(self)
-
-            # If it's a list (resultSets), convert to dict keyed by name
-            if isinstance(data_sets, list):
-                results = {}
-                for ds in data_sets:
-                    if "name" in ds:
-                        # Map rowSet to data if missing, to satisfy different library versions
-                        if "rowSet" in ds and "data" not in ds:
-                            ds["data"] = ds["rowSet"]
-                        results[ds["name"]] = ds
-                return results
-            
-            # If it's a single dict (resultSet) and NOT the mapping expected, wrap it
-            if isinstance(data_sets, dict) and "name" in data_sets:
-                if "rowSet" in data_sets and "data" not in data_sets:
-                    data_sets["data"] = data_sets["rowSet"]
-                return {data_sets["name"]: data_sets}
-                
-            return data_sets
+            return _normalize_data_sets(raw_dict[key])
         except Exception:
             return original_get_data_sets(self)
 
-    NBAStatsResponse.get_data_sets = patched_get_data_sets
+    NBAStatsResponse.get_data_sets = _fast_get_data_sets
 
 patch_nba_api()
 
-def is_nan(x: Any) -> bool:
-    try: return pd.isna(x)
-    except: return x is None
+# Dedup fingerprints: hash(game_id|team) XOR a random 64-bit word per state value
+_STATE_H = {s: random.getrandbits(64) for s in ("blowout", "close", "leading", "trailing", "neutral")}
+
+def fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """Fingerprints for every row of a raw-cache frame in one hash call."""
+    base = pd.util.hash_array((df["game_id"].astype(str) + "|" + df["team"].astype(str)).to_numpy(dtype=object))
+    gs = df["game_state"].map(_STATE_H).to_numpy(dtype=np.uint64)
+    ts = df["team_state"].map(_STATE_H).to_numpy(dtype=np.uint64)
+    return base ^ gs ^ ts
+
+def row_fingerprints(rows: List[Dict[str, Any]]) -> np.ndarray:
+    """Same values as fingerprints(), for a batch of row dicts (one hash call per batch, not per row)."""
+    base = pd.util.hash_array(np.array([f"{r['game_id']}|{r['team']}" for r in rows], dtype=object))
+    gs = np.fromiter((_STATE_H[r["game_state"]] for r in rows), dtype=np.uint64, count=len(rows))
+    ts = np.fromiter((_STATE_H[r["team_state"]] for r in rows), dtype=np.uint64, count=len(rows))
+    return base ^ gs ^ ts
 
 def setup_nba_session() -> None:
     s = requests.Session()
     retries = Retry(total=5, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504])
-    s.mount("https://", HTTPAdapter(max_retries=retries))
-    s.headers.update({
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Referer": "https://stats.nba.com/",
-        "x-nba-stats-origin": "stats",
-        "x-nba-stats-token": "true",
-    })
+    # Keep connections alive across requests instead of re-handshaking each call
+    s.mount("https://", HTTPAdapter(max_retries=retries, pool_connections=16, pool_maxsize=16, pool_block=False))
+    s.headers.update(NBA_HEADERS)
     NBAStatsHTTP.get_session = staticmethod(lambda: s)
     NBAStatsHTTP._session = s
 
+def reset_nba_session() -> None:
+    """Drops the pooled session (stale keep-alive sockets cause cascading timeouts) and builds a fresh one."""
+    old = NBAStatsHTTP._session
+    NBAStatsHTTP._session = None
+    if old is not None: old.close()
+    setup_nba_session()
+
+def nba_frame(endpoint: Any, **kwargs: Any) -> pd.DataFrame:
+    """First result set of an nba_api endpoint; on a timeout, resets the session and retries once."""
+    try:
+        return endpoint(**kwargs).get_data_frames()[0]
+    except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError) as e:
+        logger.warning(f"{endpoint.__name__}: {type(e).__name__}; resetting NBA session and retrying.")
+        reset_nba_session()
+        return endpoint(**kwargs).get_data_frames()[0]
+
+_REQUIRED_LINE_COLS = frozenset({"TEAM_ID", "TEAM_ABBREVIATION", "PTS_QTR1", "PTS_QTR2", "PTS_QTR3"})
+
 def extract_line_score_table(dfs: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
-    required = {"TEAM_ID", "TEAM_ABBREVIATION", "PTS_QTR1", "PTS_QTR2", "PTS_QTR3"}
     for d in dfs:
-        if required.issubset(set(d.columns)) and len(d) >= 2:
+        if len(d) >= 2 and _REQUIRED_LINE_COLS.issubset(d.columns):
             return d
     return None
 
-def load_manifest(filepath: str) -> pd.DataFrame:
-    if os.path.exists(filepath):
-        return pd.read_csv(filepath, dtype={"game_id": str})
-    return pd.DataFrame(columns=["game_id", "status", "reason", "processed_at_utc"])
-
-def load_raw_cache(filepath: str) -> pd.DataFrame:
-    if os.path.exists(filepath):
-        return pd.read_csv(filepath, dtype={"game_id": str, "team": str, "game_state": str, "team_state": str})
-    return pd.DataFrame(columns=["game_id", "team", "game_state", "team_state", "pace", "ortg", "poss", "fta_rate"])
-
-def append_to_csv(df: pd.DataFrame, filepath: str) -> None:
-    if df.empty: return
-    header = not os.path.exists(filepath)
-    df.to_csv(filepath, mode="a", header=header, index=False)
+def has_parquet_parts(path: str) -> bool:
+    return os.path.isdir(path) and any(f.endswith(".parquet") for f in os.listdir(path))
+
+def migrate_legacy_csv(csv_path: str, parquet_path: str, schema: pa.Schema) -> None:
+    """One-time import of a pre-Parquet CSV cache so earlier runs aren't re-mined."""
+    if not os.path.exists(csv_path) or has_parquet_parts(parquet_path): return
+    df = pd.read_csv(csv_path, dtype={f.name: str for f in schema if pa.types.is_string(f.type) or pa.types.is_dictionary(f.type)})
+    write_part(pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False), parquet_path)
+    logger.info(f"Migrated {len(df)} rows from {csv_path} to {parquet_path}")
+
+def load_manifest(path: str) -> pd.DataFrame:
+    if has_parquet_parts(path):
+        return pd.read_parquet(path)
+    return pd.DataFrame(columns=MANIFEST_SCHEMA.names)
+
+def load_raw_cache(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    if has_parquet_parts(path):
+        # Reading against RAW_SCHEMA also casts part files written before the current schema
+        df = pd.read_parquet(path, columns=columns, schema=RAW_SCHEMA)
+    else:
+        df = pd.DataFrame(columns=columns or RAW_SCHEMA.names)
+    for c in LABEL_COLUMNS:
+        if c not in df.columns: continue
+        # Part files each carry their own dictionary; sort so groupby order stays alphabetical
+        cat = df[c].astype("category")
+        df[c] = cat.cat.reorder_categories(sorted(cat.cat.categories))
+    return df
+
+def write_part(table: pa.Table, path: str) -> None:
+    """Writes one immutable part file per flush, so a crash never corrupts earlier batches."""
+    if table.num_rows == 0: return
+    os.makedirs(path, exist_ok=True)
+    pq.write_table(table, os.path.join(path, f"part-{time.time_ns()}.parquet"), compression="snappy", data_page_version="2.0")
+
+def append_parquet(rows: List[Dict[str, Any]], path: str, schema: pa.Schema) -> None:
+    """Row dicts straight to Arrow; no pandas round-trip for a batch flush."""
+    if rows: write_part(pa.Table.from_pylist(rows, schema=schema), path)
 
 def get_completed_game_data(season: str) -> pd.DataFrame:
     logger.info(f"Fetching game data for {season}...")
     try:
-        finder = leaguegamefinder.LeagueGameFinder(season_nullable=season, league_id_nullable=LEAGUE_ID, season_type_nullable=SEASON_TYPE)
-        games = finder.get_data_frames()[0]
+        games = nba_frame(leaguegamefinder.LeagueGameFinder, season_nullable=season, league_id_nullable=LEAGUE_ID, season_type_nullable=SEASON_TYPE)
         if games is None or games.empty: return pd.DataFrame()
-        games = games[games["GAME_ID"].astype(str).str.startswith("002")]
-        games = games[games["WL"].notna()]
+        gid_int = pd.to_numeric(games["GAME_ID"], errors="coerce")
+        games = games.loc[((gid_int // 10_000_000) == 2) & games["WL"].notna()]
         return games
     except Exception as e:
         logger.error(f"Failed to fetch games: {e}")
         return pd.DataFrame()
 
-def get_q3_margins(game_id: str) -> Optional[Dict[int, int]]:
+def fetch_all_quarter_scores(season: str) -> Dict[str, Dict[int, int]]:
+    """
+    Margins entering Q4 for every game of the season: GAME_ID -> {TEAM_ID: margin}.
+    One TeamGameLogs request per period (1-3) replaces one line-score request per game.
+    Games without complete Q1-Q3 rows for both teams are left out (callers fall back per game).
+    """
     try:
-        summ = boxscoresummaryv2.BoxScoreSummaryV2(game_id=game_id)
-        dfs = summ.get_data_frames()
-        line = extract_line_score_table(dfs)
+        frames = []
+        for period in (1, 2, 3):
+            logs = nba_frame(teamgamelogs.TeamGameLogs, season_nullable=season, league_id_nullable=LEAGUE_ID, season_type_nullable=SEASON_TYPE, period_nullable=str(period))
+            frames.append(logs[["GAME_ID", "TEAM_ID", "PTS"]])
+        q = pd.concat(frames, ignore_index=True)
+        q["PTS"] = pd.to_numeric(q["PTS"], errors="coerce").fillna(0)
+
+        by_team = q.groupby(["GAME_ID", "TEAM_ID"])["PTS"].agg(["sum", "count"])
+        by_team = by_team[by_team["count"] == 3]["sum"]
+        by_team = by_team[by_team.groupby(level="GAME_ID").transform("size") == 2]
+        margin = (2 * by_team - by_team.groupby(level="GAME_ID").transform("sum")).astype(int)
+
+        margins: Dict[str, Dict[int, int]] = {}
+        for (gid, tid), m in margin.items():
+            margins.setdefault(str(gid), {})[int(tid)] = int(m)
+        logger.info(f"Bulk line scores: margins for {len(margins)} games.")
+        return margins
+    except Exception as e:
+        logger.error(f"Bulk line-score fetch failed, falling back to per-game requests: {e}")
+        return {}
+
+def result_sets_to_frames(payload: Dict[str, Any]) -> List[pd.DataFrame]:
+    """Raw stats.nba.com JSON -> one DataFrame per result set (resultSets or resultSet)."""
+    sets = payload.get("resultSets") or payload.get("resultSet") or []
+    if isinstance(sets, dict): sets = [sets]
+    return [pd.DataFrame(ds.get("rowSet") or ds.get("data") or [], columns=ds.get("headers", [])) for ds in sets]
+
+def parse_q3_margins(payload: Dict[str, Any]) -> Optional[Dict[int, int]]:
+    try:
+        line = extract_line_score_table(result_sets_to_frames(payload))
         if line is None or len(line) < 2: return None
         for c in ["PTS_QTR1", "PTS_QTR2", "PTS_QTR3"]:
             line[c] = pd.to_numeric(line[c], errors="coerce").fillna(0).astype(int)
@@ -201,18 +319,130 @@ def get_q3_margins(game_id: str) -> Optional[Dict[int, int]]:
         return {t1_id: t1_pts - t2_pts, t2_id: t2_pts - t1_pts}
     except: return None
 
-def fetch_q4_rows_fallback(game_id: str, margins: Dict[int, int], team_stats: pd.DataFrame) -> Tuple[List[Dict[str, Any]], str]:
+class HostThrottle:
+    """Shared pause for all requests to one host, set from 429 Retry-After headers."""
+    def __init__(self) -> None:
+        self.resume_at = 0.0
+
+    async def wait(self) -> None:
+        delay = self.resume_at - time.monotonic()
+        if delay > 0: await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+class ResponseCache:
+    """Raw boxscore payloads on disk, so reruns and --retry-errors don't re-hit the API."""
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def path(self, game_id: str) -> Path:
+        # Game IDs share their leading digits ("002..."); shard on the trailing two instead
+        return self.root / game_id[-2:] / (f"{game_id}.json.zst" if zstd else f"{game_id}.json")
+
+    def get(self, game_id: str) -> Optional[Dict[str, Any]]:
+        p = self.path(game_id)
+        if not p.exists(): return None
+        try:
+            raw = p.read_bytes()
+            return orjson.loads(zstd.ZstdDecompressor().decompress(raw) if zstd else raw)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {p}: {e}")
+            return None
+
+    def put(self, game_id: str, payload: Dict[str, Any]) -> None:
+        p = self.path(game_id)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        raw = orjson.dumps(payload)
+        p.write_bytes(zstd.ZstdCompressor().compress(raw) if zstd else raw)
+
+async def fetch_summary_json(session: aiohttp.ClientSession, sem: asyncio.Semaphore, throttle: HostThrottle, cache: ResponseCache, game_id: str) -> Optional[Dict[str, Any]]:
+    cached = cache.get(game_id)
+    if cached is not None: return cached
+    backoff = BACKOFF_START
+    async with sem:
+        for _ in range(MAX_ATTEMPTS):
+            await throttle.wait()
+            try:
+                async with session.get(f"{NBA_STATS_URL}/boxscoresummaryv2", params={"GameID": game_id}) as resp:
+                    if resp.status == 429:
+                        retry_after = resp.headers.get("Retry-After", "")
+                        throttle.pause(float(retry_after) if retry_after.isdigit() else jittered(backoff))
+                    elif resp.status >= 500:
+                        await asyncio.sleep(jittered(backoff))
+                    elif resp.status >= 400:
+                        # 403/404 etc. won't change on retry; record the game as failed
+                        logger.warning(f"Summary fetch failed for {game_id}: HTTP {resp.status}")
+                        return None
+                    else:
+                        payload = await resp.json(content_type=None)
+                        cache.put(game_id, payload)
+                        return payload
+            except ValueError as e:
+                # 200 with a non-JSON body (e.g. an HTML block page)
+                logger.warning(f"Summary fetch failed for {game_id}: non-JSON response: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Summary fetch failed for {game_id}: {type(e).__name__}: {e}")
+                await asyncio.sleep(jittered(backoff))
+            backoff = min(backoff * 2, BACKOFF_CAP)
+    return None
+
+async def fetch_q3_margins(game_ids: List[str], cache: ResponseCache) -> Dict[str, Optional[Dict[int, int]]]:
+    """Line scores for a batch of games, fetched concurrently (at most MAX_CONCURRENCY in flight)."""
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    throttle = HostThrottle()
+    connector = aiohttp.TCPConnector(limit_per_host=MAX_CONCURRENCY, keepalive_timeout=60)
+    async with aiohttp.ClientSession(headers=NBA_HEADERS, connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as session:
+        payloads = await asyncio.gather(*[fetch_summary_json(session, sem, throttle, cache, gid) for gid in game_ids], return_exceptions=True)
+    # One game's failure is recorded as no_linescore; it must not abort the batch
+    return {gid: (parse_q3_margins(p) if isinstance(p, dict) else None) for gid, p in zip(game_ids, payloads)}
+
+def compute_team_metrics(team_stats: pd.DataFrame) -> Dict[str, List[Any]]:
+    """
+    Game-total efficiency proxies for every team-game in one vectorized pass.
+    Returns: GAME_ID -> list of row records (TEAM_ID, team, pace, ortg, poss, fta_rate, usable)
+    """
+    def col(name: str, default: float = 0.0) -> np.ndarray:
+        if name not in team_stats: return np.full(len(team_stats), default)
+        return pd.to_numeric(team_stats[name], errors="coerce").to_numpy(dtype=float)
+
+    pts, fga, fta, tov, oreb = col("PTS"), col("FGA"), col("FTA"), col("TOV"), col("OREB")
+    tid = col("TEAM_ID", np.nan)
+    has_tid = ~np.isnan(tid)
+    min_played = col("MIN", 240.0) / 5.0 # Divide by 5 because MIN in finder is team total (usually ~240)
+
+    # Manual Efficiency Calculation (Proxy for Q4)
+    poss = fga + (0.44 * fta) - oreb + tov
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pace = np.where(min_played > 0, (poss / min_played) * 48, 100.0)
+        ortg = np.where(poss > 0, (pts / poss) * 100, 110.0)
+        fta_rate = np.where(fga > 0, np.round(fta / fga, 4), 0.0)
+
+    metrics = pd.DataFrame({
+        "GAME_ID": team_stats["GAME_ID"].to_numpy(),
+        "TEAM_ID": np.where(has_tid, tid, 0).astype(np.int64),
+        "team": team_stats["TEAM_ABBREVIATION"].fillna("").astype(str).str.strip().to_numpy(),
+        "pace": np.round(pace, 2).astype(np.float32), "ortg": np.round(ortg, 2).astype(np.float32),
+        "poss": np.round(poss / 4, 2).astype(np.float32), # Q4 proxy is roughly 1/4 of total
+        "fta_rate": fta_rate.astype(np.float32),
+        "usable": has_tid & ~(poss <= 0),
+    })
+    by_game: Dict[str, List[Any]] = {}
+    for rec in metrics.itertuples(index=False):
+        by_game.setdefault(rec.GAME_ID, []).append(rec)
+    return by_game
+
+def fetch_q4_rows_fallback(game_id: str, margins: Dict[int, int], team_metrics: Dict[str, List[Any]]) -> Tuple[List[Dict[str, Any]], str]:
     """Fallback: Uses game-total stats as a proxy for Q4 efficiency when detailed boxscores are blocked."""
     try:
-        game_rows = team_stats[team_stats["GAME_ID"] == game_id]
+        game_rows = team_metrics.get(game_id, [])
         if len(game_rows) < 2: return [], "ERROR_NO_DATA"
         
         rows = []
-        for _, row in game_rows.iterrows():
-            tid = row.get("TEAM_ID")
-            if is_nan(tid): continue
-            tid = int(tid)
-            if tid not in margins: continue
+        for rec in game_rows:
+            tid = rec.TEAM_ID
+            if not rec.usable or tid not in margins: continue
 
             margin = margins[tid]
             abs_m = abs(margin)
@@ -222,123 +452,143 @@ def fetch_q4_rows_fallback(game_id: str, margins: Dict[int, int], team_stats: pd
                 g_state, t_state = "close", "neutral"
             else: continue
 
-            team_abbr = str(row.get("TEAM_ABBREVIATION") or "").strip()
-            pts = float(row.get("PTS", 0))
-            fga = float(row.get("FGA", 0))
-            fta = float(row.get("FTA", 0))
-            tov = float(row.get("TOV", 0))
-            oreb = float(row.get("OREB", 0))
-            min_played = float(row.get("MIN", 240)) / 5.0 # Divide by 5 because MIN in finder is team total (usually ~240)
-            
-            # Manual Efficiency Calculation (Proxy for Q4)
-            poss = fga + (0.44 * fta) - oreb + tov
-            if poss <= 0: continue
-            
-            pace = (poss / min_played) * 48 if min_played > 0 else 100
-            ortg = (pts / poss) * 100 if poss > 0 else 110
-            
             rows.append({
-                "game_id": game_id, "team": team_abbr, "game_state": g_state, 
-                "team_state": t_state, "pace": round(pace, 2), "ortg": round(ortg, 2), 
-                "poss": round(poss / 4, 2), # Q4 proxy is roughly 1/4 of total
-                "fta_rate": round(fta / fga, 4) if fga > 0 else 0
+                "game_id": game_id, "team": rec.team, "game_state": g_state,
+                "team_state": t_state, "pace": rec.pace, "ortg": rec.ortg,
+                "poss": rec.poss, "fta_rate": rec.fta_rate
             })
         return rows, ("DONE" if rows else "SKIP_MEDIUM")
     except Exception as e:
         logger.error(f"fetch_q4_rows_fallback failed for {game_id}: {e}")
-        traceback.print_exc()
+        logger.debug("Traceback:", exc_info=True)
         return [], f"ERROR_{type(e).__name__}"
 
-def generate_priors(df: pd.DataFrame, season: str) -> Dict[str, Any]:
-    priors = []
-    if df.empty: return {"season": season, "priors": []}
-    for team in sorted(df["team"].unique()):
-        t_df = df[df["team"] == team]
-        close_df = t_df[t_df["game_state"] == "close"].copy()
+def iter_priors(df: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    """One prior per team, in team order, from a single groupby pass over the raw cache."""
+    if df.empty: return
+    for team, t_df in df.groupby("team", sort=True, observed=True):
+        by_state = dict(tuple(t_df.groupby("game_state", sort=False, observed=True)))
+        close_df = by_state.get("close", t_df.iloc[:0])
         if ENABLE_FOUL_FILTER and "fta_rate" in close_df.columns:
             close_df = close_df[(close_df["fta_rate"].isna()) | (close_df["fta_rate"] <= CLOSE_FTA_RATE_MAX)]
 
-        close_poss = close_df["poss"].sum()
+        # Accumulate in float64; the float32 column only narrows storage
+        weights = close_df["poss"].to_numpy(dtype=np.float64)
+        close_poss = weights.sum()
         if close_poss < BASELINE_MIN_POSS: continue
 
-        base_pace = np.average(close_df["pace"], weights=close_df["poss"])
-        base_ortg = np.average(close_df["ortg"], weights=close_df["poss"])
+        base_pace = close_df["pace"].to_numpy(dtype=np.float64) @ weights / close_poss
+        base_ortg = close_df["ortg"].to_numpy(dtype=np.float64) @ weights / close_poss
         entry = {"team": team, "baseline": {"pace": round(base_pace, 2), "ortg": round(base_ortg, 2), "nPoss": int(close_poss)}}
 
-        blowout_df = t_df[t_df["game_state"] == "blowout"]
+        blowout_df = by_state.get("blowout", t_df.iloc[:0])
+        by_team_state = dict(tuple(blowout_df.groupby("team_state", sort=False, observed=True)))
         for state in ["leading", "trailing"]:
-            s_df = blowout_df[blowout_df["team_state"] == state]
-            s_poss = s_df["poss"].sum()
+            s_df = by_team_state.get(state)
+            if s_df is None: continue
+            weights = s_df["poss"].to_numpy(dtype=np.float64)
+            s_poss = weights.sum()
             if s_poss >= TREATMENT_MIN_POSS:
-                avg_pace = np.average(s_df["pace"], weights=s_df["poss"])
-                avg_ortg = np.average(s_df["ortg"], weights=s_df["poss"])
+                avg_pace = s_df["pace"].to_numpy(dtype=np.float64) @ weights / s_poss
+                avg_ortg = s_df["ortg"].to_numpy(dtype=np.float64) @ weights / s_poss
                 entry[state] = {"paceDelta": round(avg_pace / base_pace, 4), "pppDelta": round(avg_ortg / base_ortg, 4), "nPoss": int(s_poss)}
-        if "leading" in entry or "trailing" in entry: priors.append(entry)
-    return {"league": "NBA", "season": season, "generated_at": pd.Timestamp.utcnow().isoformat(), "priors": priors}
+        if "leading" in entry or "trailing" in entry: yield entry
+
+def write_priors(path: str, df: pd.DataFrame, season: str) -> None:
+    """Streams the priors JSON one team at a time instead of building the whole payload first."""
+    meta = {"league": "NBA", "season": season, "generated_at": datetime.now(timezone.utc).isoformat()}
+    with open(path, "wb") as f:
+        f.write(b"{\n")
+        for k, v in meta.items():
+            f.write(b"  " + orjson.dumps(k) + b": " + orjson.dumps(v) + b",\n")
+        f.write(b'  "priors": [')
+        for i, entry in enumerate(iter_priors(df)):
+            f.write((b"," if i else b"") + b"\n    " + orjson.dumps(entry, option=orjson.OPT_SERIALIZE_NUMPY))
+        f.write(b"\n  ]\n}\n")
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--season", type=str, default=DEFAULT_SEASON)
     parser.add_argument("--retry-errors", action="store_true")
+    parser.add_argument("--cache-dir", type=str, default="cache", help="Where raw boxscore responses are cached")
+    parser.add_argument("--verbose", action="store_true", help="Debug logging, including tracebacks for per-game failures")
     args = parser.parse_args()
+    if args.verbose: logger.setLevel(logging.DEBUG)
+    response_cache = ResponseCache(args.cache_dir)
 
-    raw_file = f"raw_q4_data_{args.season}.csv"
-    manifest_file = f"processed_games_{args.season}.csv"
+    raw_file = f"raw_q4_data_{args.season}.parquet"
+    manifest_file = f"processed_games_{args.season}.parquet"
+    migrate_legacy_csv(f"raw_q4_data_{args.season}.csv", raw_file, RAW_SCHEMA)
+    migrate_legacy_csv(f"processed_games_{args.season}.csv", manifest_file, MANIFEST_SCHEMA)
     setup_nba_session()
 
     manifest = load_manifest(manifest_file)
     processed_ids = set(manifest[manifest["status"].isin(["DONE", "SKIP_MEDIUM"])]["game_id"].astype(str)) if args.retry_errors else set(manifest["game_id"].astype(str))
     
-    raw_df = load_raw_cache(raw_file)
-    existing_keys = set(zip(raw_df["game_id"], raw_df["team"], raw_df["game_state"], raw_df["team_state"])) if not raw_df.empty else set()
+    raw_df = load_raw_cache(raw_file, columns=["game_id", "team", "game_state", "team_state"])
+    existing_keys = set(fingerprints(raw_df).tolist()) if not raw_df.empty else set()
 
     all_games_df = get_completed_game_data(args.season)
     if all_games_df.empty:
         logger.error("No games found.")
         return
         
-    all_game_ids = all_games_df["GAME_ID"].unique().tolist()
-    new_game_ids = [g for g in all_game_ids if g not in processed_ids]
+    all_game_ids = np.asarray(all_games_df["GAME_ID"].unique(), dtype=str)
+    new_game_ids = np.setdiff1d(all_game_ids, np.array(list(processed_ids), dtype=str), assume_unique=True).tolist()
+    new_game_ids.sort()  # Chronological within a season; reproducible progress order
     logger.info(f"Targeting {len(new_game_ids)} new games...")
 
-    batch_raw, batch_manifest = [], []
-    for i, gid in enumerate(new_game_ids):
-        try:
-            margins = get_q3_margins(gid)
-            human_delay(SLEEP_SUMMARY)
-            if not margins:
-                batch_manifest.append({"game_id": gid, "status": "ERROR", "reason": "no_linescore", "processed_at_utc": pd.Timestamp.utcnow().isoformat()})
-                continue
-            
-            rows, status = fetch_q4_rows_fallback(gid, margins, all_games_df)
-            human_delay(SLEEP_ADV)
-
-            if status == "DONE":
-                added = 0
-                for r in rows:
-                    key = (r["game_id"], r["team"], r["game_state"], r["team_state"])
-                    if key not in existing_keys:
-                        batch_raw.append(r)
-                        existing_keys.add(key)
-                        added += 1
-                batch_manifest.append({"game_id": gid, "status": "DONE", "reason": "success", "processed_at_utc": pd.Timestamp.utcnow().isoformat()})
-                if added: logger.info(f"Game {gid}: Captured {added} rows.")
-            else:
-                batch_manifest.append({"game_id": gid, "status": "SKIP_MEDIUM" if "SKIP" in status else "ERROR", "reason": status, "processed_at_utc": pd.Timestamp.utcnow().isoformat()})
-        except Exception as e:
-            logger.error(f"Failed {gid}: {e}")
-            traceback.print_exc()
+    team_metrics = compute_team_metrics(all_games_df)
+    # Season-wide pulls are only worth their three requests when there is something to process
+    bulk_margins = fetch_all_quarter_scores(args.season) if new_game_ids else {}
 
-        if len(batch_manifest) >= BATCH_SIZE or i == len(new_game_ids)-1:
-            append_to_csv(pd.DataFrame(batch_raw), raw_file)
-            append_to_csv(pd.DataFrame(batch_manifest), manifest_file)
-            batch_raw, batch_manifest = [], []
-            logger.info(f"Progress: {i+1}/{len(new_game_ids)} saved.")
+    batch_raw, batch_manifest = [], []
+    for start in range(0, len(new_game_ids), BATCH_SIZE):
+        batch_ids = new_game_ids[start:start + BATCH_SIZE]
+        now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")  # One manifest timestamp per batch
+        margins_by_game = {gid: bulk_margins[gid] for gid in batch_ids if gid in bulk_margins}
+        missing = [gid for gid in batch_ids if gid not in margins_by_game]
+        if missing:
+            margins_by_game.update(asyncio.run(fetch_q3_margins(missing, response_cache)))
+
+        candidates: List[Dict[str, Any]] = []
+        for gid in batch_ids:
+            try:
+                margins = margins_by_game.get(gid)
+                if not margins:
+                    batch_manifest.append({"game_id": gid, "status": "ERROR", "reason": "no_linescore", "processed_at_utc": now_iso})
+                    continue
+                
+                rows, status = fetch_q4_rows_fallback(gid, margins, team_metrics)
+
+                if status == "DONE":
+                    candidates.extend(rows)
+                    batch_manifest.append({"game_id": gid, "status": "DONE", "reason": "success", "processed_at_utc": now_iso})
+                else:
+                    batch_manifest.append({"game_id": gid, "status": "SKIP_MEDIUM" if "SKIP" in status else "ERROR", "reason": status, "processed_at_utc": now_iso})
+            except Exception as e:
+                logger.error(f"Failed {gid}: {e}")
+                logger.debug("Traceback:", exc_info=True)
+
+        # Dedupe the whole batch against the cache with one fingerprint pass
+        added_by_game: Dict[str, int] = {}
+        if candidates:
+            for r, key in zip(candidates, row_fingerprints(candidates).tolist()):
+                if key in existing_keys: continue
+                existing_keys.add(key)
+                batch_raw.append(r)
+                added_by_game[r["game_id"]] = added_by_game.get(r["game_id"], 0) + 1
+        for gid, added in added_by_game.items():
+            logger.info(f"Game {gid}: Captured {added} rows.")
+
+        append_parquet(batch_raw, raw_file, RAW_SCHEMA)
+        append_parquet(batch_manifest, manifest_file, MANIFEST_SCHEMA)
+        batch_raw, batch_manifest = [], []
+        logger.info(f"Progress: {start + len(batch_ids)}/{len(new_game_ids)} saved.")
 
     logger.info("Finalizing JSON...")
     df = load_raw_cache(raw_file)
-    with open(f"blowout_priors_{args.season}.json", "w") as f:
-        json.dump(generate_priors(df, args.season), f, indent=2, cls=NumpyEncoder)
+    write_priors(f"blowout_priors_{args.season}.json", df, args.season)
     logger.info("Done.")
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
+import os
 import sys
+import numpy as np
 import pandas as pd
 try:
-    from nba_api.stats.endpoints import leaguegamefinder
-    print("Successfully imported nba_api", file=sys.stderr)
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+    from nba_cache import load_games
+    print("Successfully imported nba_cache", file=sys.stderr)
 except ImportError as e:
     print(f"ImportError: {e}", file=sys.stderr)
     sys.exit(1)
@@ -11,44 +14,46 @@ def count_games_under_200():
     season = "2025-26"
     print(f"Fetching data for {season} season...", file=sys.stderr)
     try:
-        finder = leaguegamefinder.LeagueGameFinder(season_nullable=season, league_id_nullable="00", season_type_nullable="Regular Season")
-        games = finder.get_data_frames()[0]
+        games = load_games(season, "Regular Season", columns=["GAME_ID", "WL", "TEAM_ABBREVIATION", "PTS", "GAME_DATE"])
         print(f"Data fetched: {len(games)} rows", file=sys.stderr)
         
-        # Filter for NBA regular season games
-        games = games[games["GAME_ID"].astype(str).str.startswith("002")]
-        games = games[games["WL"].notna()]
+        # Filter for completed NBA regular season games ("002xxxxxxx" -> 2 after // 10**7)
+        gid_int = pd.to_numeric(games["GAME_ID"], errors="coerce")
+        games = games.loc[((gid_int // 10_000_000) == 2) & games["WL"].notna()]
         
-        # Group by GAME_ID and sum PTS to get total points per game
-        game_totals = games.groupby("GAME_ID")["PTS"].sum().reset_index()
+        # Total points per game: factorize GAME_ID once, then a single weighted bincount
+        codes, uniques = pd.factorize(games["GAME_ID"], sort=False)
+        totals = np.bincount(codes, weights=games["PTS"].to_numpy(dtype=float), minlength=len(uniques))
         
         # Count games where total points < 200
-        under_200 = game_totals[game_totals["PTS"] < 200]
-        count = len(under_200)
+        under_mask = totals < 200
+        count = int(under_mask.sum())
         
-        print(f"Total NBA regular season games played so far (2025-26): {len(game_totals)}")
+        print(f"Total NBA regular season games played so far (2025-26): {len(uniques)}")
         print(f"Games with < 200 total points: {count}")
         
         if count > 0:
             print("\nDetail of low-scoring games:")
-            # Filter the original games DF for these IDs
-            low_score_games = games[games["GAME_ID"].isin(under_200["GAME_ID"])]
+            # Filter the original games DF for these IDs (per-row lookup through the game codes)
+            low_score_games = games[under_mask[codes]]
             
-            # Group by GAME_ID and iterate
-            for gid, group in low_score_games.groupby("GAME_ID"):
-                if len(group) == 2:
-                    t1 = group.iloc[0]["TEAM_ABBREVIATION"]
-                    s1 = group.iloc[0]["PTS"]
-                    t2 = group.iloc[1]["TEAM_ABBREVIATION"]
-                    s2 = group.iloc[1]["PTS"]
-                    date = group.iloc[0]["GAME_DATE"]
+            # Pivot to one row per game (side 0 / side 1) and iterate once
+            side = low_score_games.groupby("GAME_ID").cumcount()
+            wide = low_score_games.assign(side=side).pivot(
+                index="GAME_ID", columns="side", values=["TEAM_ABBREVIATION", "PTS", "GAME_DATE"]
+            )
+            wide.columns = [f"{col}_{s}" for col, s in wide.columns]
+            wide = wide.reindex(columns=["TEAM_ABBREVIATION_0", "PTS_0", "GAME_DATE_0", "TEAM_ABBREVIATION_1", "PTS_1"])
+
+            for row in wide.itertuples(index=True):
+                t1, s1, date = row.TEAM_ABBREVIATION_0, int(row.PTS_0), row.GAME_DATE_0
+                if pd.notna(row.TEAM_ABBREVIATION_1):
+                    t2, s2 = row.TEAM_ABBREVIATION_1, int(row.PTS_1)
                     total = s1 + s2
                     print(f"- {date}: {t1} ({s1}) vs {t2} ({s2}) | Total: {total}")
                 else:
                     # Incomplete data for this game ID
-                    t1 = group.iloc[0]["TEAM_ABBREVIATION"]
-                    s1 = group.iloc[0]["PTS"]
-                    print(f"- {group.iloc[0]['GAME_DATE']}: Game {gid} (Only {t1} {s1} found)")
+                    print(f"- {date}: Game {row.Index} (Only {t1} {s1} found)")
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
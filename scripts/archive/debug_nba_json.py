@@ -12,16 +12,17 @@ params = {
     "EndRange": 0,
     "RangeType": 0
 }
-headers = {
+session = requests.Session()
+session.headers.update({
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Referer": "https://stats.nba.com/",
     "x-nba-stats-origin": "stats",
     "x-nba-stats-token": "true",
-}
+})
 
 try:
     print(f"Fetching raw JSON for {gid}...")
-    resp = requests.get(url, params=params, headers=headers, timeout=30)
+    resp = session.get(url, params=params, timeout=30)
     print(f"Status: {resp.status_code}")
     data = resp.json()
     print("Keys found in JSON:")
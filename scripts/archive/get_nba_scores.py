@@ -2,23 +2,28 @@ import requests
 import datetime
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # Ensure output is printed immediately
 sys.stdout.reconfigure(line_buffering=True)
 
+# One pooled session shared by all worker threads (HTTP keep-alive)
+MAX_WORKERS = 16
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
 def get_scores_for_date(date_str):
     url = f"http://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard?dates={date_str}"
     try:
-        response = requests.get(url, timeout=10)
+        response = session.get(url, timeout=10)
         data = response.json()
-        games = []
-        for event in data.get('events', []):
-            competition = event['competitions'][0]
-            if competition['status']['type']['state'] == 'post':
-                home_score = int(competition['competitors'][0]['score'])
-                away_score = int(competition['competitors'][1]['score'])
-                games.append(home_score + away_score)
-        return games
+        # Total points (home + away) for every completed event
+        comps = (event['competitions'][0] for event in data.get('events', ()))
+        return [
+            int(c['competitors'][0]['score']) + int(c['competitors'][1]['score'])
+            for c in comps if c['status']['type']['state'] == 'post'
+        ]
     except Exception as e:
         print(f"Error for {date_str}: {e}")
         return []
@@ -30,15 +35,13 @@ total_games = 0
 
 print(f"Scanning NBA games from {start_date} to {end_date}...")
 
-current_date = start_date
-while current_date <= end_date:
-    date_str = current_date.strftime("%Y%m%d")
-    scores = get_scores_for_date(date_str)
-    for score in scores:
-        total_games += 1
-        if score < 200:
-            under_200_count += 1
-    current_date += datetime.timedelta(days=1)
+dates = [start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+    results = list(ex.map(get_scores_for_date, [d.strftime("%Y%m%d") for d in dates]))
+
+for scores in results:
+    total_games += len(scores)
+    under_200_count += sum(1 for s in scores if s < 200)
 
 print(f"Scan complete.")
 print(f"Total games analyzed: {total_games}")
@@ -1,29 +1,45 @@
+import os
 import pandas as pd
 
-def calculate_q4_drtg(target_team, csv_path="raw_q4_data_2025-26.csv"):
-    df = pd.read_csv(csv_path, names=["game_id", "team", "game_state", "team_state", "pace", "ortg", "poss", "fta_rate"])
+RAW_COLUMNS = ["game_id", "team", "game_state", "team_state", "pace", "ortg", "poss", "fta_rate"]
+
+def converted_path(csv_path):
+    # Not raw_q4_data_*.parquet: mine_blowout_priors.py owns that path as a dataset directory
+    return csv_path.replace('.csv', '_csv.parquet')
+
+def convert_raw_to_parquet(csv_path="raw_q4_data_2025-26.csv"):
+    """One-shot CSV -> Parquet conversion so later reads skip CSV parsing."""
+    parquet_path = converted_path(csv_path)
+    df = pd.read_csv(csv_path, names=RAW_COLUMNS, dtype={"game_id": str, "team": str, "game_state": str, "team_state": str})
     
-    # Ensure numeric types
-    df['ortg'] = pd.to_numeric(df['ortg'], errors='coerce')
+    # Ensure numeric types (also drops a stray header row, if present)
+    for c in ("pace", "ortg", "poss", "fta_rate"):
+        df[c] = pd.to_numeric(df[c], errors='coerce')
+    df = df.dropna(subset=['ortg'])
     
-    # Get all game IDs for the target team
-    target_games = df[df['team'] == target_team]['game_id'].unique()
+    df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    return parquet_path
+
+def calculate_q4_drtg(target_team, csv_path="raw_q4_data_2025-26.csv"):
+    parquet_path = csv_path.replace('.csv', '.parquet')
+    # mine_blowout_priors.py writes the Parquet dataset directory itself; only legacy CSVs need converting
+    if not os.path.isdir(parquet_path):
+        parquet_path = converted_path(csv_path)
+        if os.path.exists(csv_path) and (
+            not os.path.exists(parquet_path) or os.path.getmtime(csv_path) > os.path.getmtime(parquet_path)
+        ):
+            convert_raw_to_parquet(csv_path)
     
-    results = []
-    for gid in target_games:
-        # Find the game rows
-        game_rows = df[df['game_id'] == gid]
-        if len(game_rows) >= 2:
-            # The opponent's ORTG is our DRTG
-            opponent_row = game_rows[game_rows['team'] != target_team]
-            if not opponent_row.empty:
-                val = opponent_row.iloc[0]['ortg']
-                if not pd.isna(val):
-                    results.append(val)
+    # Projection pushdown: only the three columns we need are read from disk
+    df = pd.read_parquet(parquet_path, columns=['game_id', 'team', 'ortg'])
     
-    if results:
-        avg_drtg = sum(results) / len(results)
-        return avg_drtg, len(results)
+    # Pair every row with the other rows of the same game; the opponent's ORTG is our DRTG
+    merged = df.merge(df[['game_id', 'team', 'ortg']], on='game_id', suffixes=('_a', '_b'))
+    opp = merged[(merged['team_a'] == target_team) & (merged['team_b'] != target_team)]
+    opp = opp.drop_duplicates('game_id')['ortg_b'].dropna()
+
+    if not opp.empty:
+        return opp.mean(), len(opp)
     return 0, 0
 
 print("Pelicans Q4 Defensive Average (2025-26):")
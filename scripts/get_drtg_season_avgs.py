@@ -1,24 +1,31 @@
-from nba_api.stats.endpoints import leaguegamefinder
+import os
+import sys
+import numpy as np
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+from nba_cache import load_games
+
 def get_defensive_averages(team_abbr, season="2025-26"):
-    finder = leaguegamefinder.LeagueGameFinder(season_nullable=season, league_id_nullable="00", season_type_nullable="Regular Season")
-    games = finder.get_data_frames()[0]
+    games = load_games(season, "Regular Season", columns=['GAME_ID', 'TEAM_ABBREVIATION', 'FGA', 'FTA', 'TOV', 'OREB', 'PTS'])
     
     # Get all games where this team played
     team_game_ids = games[games['TEAM_ABBREVIATION'] == team_abbr]['GAME_ID'].unique()
     relevant_games = games[games['GAME_ID'].isin(team_game_ids)]
     
     # For DRTG, we need the OPPONENT'S ORTG against this team
-    opponents_vs_team = relevant_games[relevant_games['TEAM_ABBREVIATION'] != team_abbr]
+    # One contiguous (n, 5) array: FGA, FTA, TOV, OREB, PTS
+    opp = relevant_games.loc[
+        relevant_games['TEAM_ABBREVIATION'] != team_abbr, ['FGA', 'FTA', 'TOV', 'OREB', 'PTS']
+    ].to_numpy(dtype=float)
     
     # Calculate opponent possessions to get their ORTG (which is our DRTG)
-    opponents_vs_team['OPP_POSS'] = opponents_vs_team['FGA'] + (0.44 * opponents_vs_team['FTA']) + opponents_vs_team['TOV'] - opponents_vs_team['OREB']
-    opponents_vs_team['OPP_ORTG'] = (opponents_vs_team['PTS'] / opponents_vs_team['OPP_POSS']) * 100
+    opp_poss = opp[:, 0] + (0.44 * opp[:, 1]) + opp[:, 2] - opp[:, 3]
+    opp_ortg = (opp[:, 4] / opp_poss) * 100
     
     return {
-        "Avg DRTG": opponents_vs_team['OPP_ORTG'].mean(),
-        "Games": len(opponents_vs_team)
+        "Avg DRTG": np.nanmean(opp_ortg),
+        "Games": opp_ortg.size
     }
 
 print("Pelicans Defensive Averages (2025-26):")
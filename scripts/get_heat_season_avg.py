@@ -1,19 +1,26 @@
-from nba_api.stats.endpoints import leaguegamefinder
+import os
+import sys
+import numpy as np
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+from nba_cache import load_games
+
 def get_season_avgs(team_abbr, season="2025-26"):
-    finder = leaguegamefinder.LeagueGameFinder(season_nullable=season, league_id_nullable="00", season_type_nullable="Regular Season")
-    games = finder.get_data_frames()[0]
-    team_games = games[games['TEAM_ABBREVIATION'] == team_abbr]
+    games = load_games(season, "Regular Season", columns=['TEAM_ABBREVIATION', 'FGA', 'FTA', 'TOV', 'OREB', 'MIN', 'PTS'])
+    team_games = games.loc[games['TEAM_ABBREVIATION'] == team_abbr, ['FGA', 'FTA', 'TOV', 'OREB', 'MIN', 'PTS']]
     
-    team_games['POSS'] = team_games['FGA'] + (0.44 * team_games['FTA']) + team_games['TOV'] - team_games['OREB']
-    team_games['PACE_CALC'] = (team_games['POSS'] / (team_games['MIN'] / 5)) * 48
-    team_games['ORTG_CALC'] = (team_games['PTS'] / team_games['POSS']) * 100
+    fga, fta, tov, oreb, mins, pts = (
+        team_games[c].to_numpy(dtype=float) for c in ('FGA', 'FTA', 'TOV', 'OREB', 'MIN', 'PTS')
+    )
+    poss = fga + (0.44 * fta) + tov - oreb
+    pace = (poss / (mins / 5)) * 48
+    ortg = (pts / poss) * 100
     
     return {
-        "Avg Pace": team_games['PACE_CALC'].mean(),
-        "Avg ORTG": team_games['ORTG_CALC'].mean(),
-        "Games": len(team_games)
+        "Avg Pace": np.nanmean(pace),
+        "Avg ORTG": np.nanmean(ortg),
+        "Games": len(fga)
     }
 
 print("Miami Heat Season Averages (2025-26):")
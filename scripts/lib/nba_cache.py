@@ -0,0 +1,72 @@
+"""
+Shared on-disk cache for LeagueGameFinder pulls used by the NBA stats scripts.
+
+The first script to ask for a (season, season_type) pays the stats.nba.com
+round-trip and writes ~/.cache/nba/{season}_{season_type}.parquet; every later
+call (in this process or the next script) reads the local file instead.
+
+Usage from a top-level script in scripts/:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+    from nba_cache import load_games
+
+From a script in scripts/analysis/ or scripts/archive/:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+    from nba_cache import load_games
+"""
+
+from __future__ import annotations
+import functools
+import os
+import time
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import pandas as pd
+
+CACHE_DIR = Path(os.environ.get("NBA_CACHE_DIR", Path.home() / ".cache" / "nba"))
+CACHE_MAX_AGE_S = 3600  # In-season data changes daily; refetch after an hour.
+LEAGUE_ID = "00"
+
+
+def cache_path(season: str, season_type: str) -> Path:
+    return CACHE_DIR / f"{season}_{season_type.replace(' ', '_')}.parquet"
+
+
+def load_games(
+    season: str,
+    season_type: str = "Regular Season",
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Returns the LeagueGameFinder team-game table for a season.
+    Pass `columns` to keep only what the caller uses; cached reads then pull
+    just those columns off disk. The DataFrame is shared between callers;
+    treat it as read-only.
+    """
+    return _load_games(season, season_type, tuple(columns) if columns is not None else None)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_games(season: str, season_type: str, columns: Optional[Tuple[str, ...]]) -> pd.DataFrame:
+    path = cache_path(season, season_type)
+    if path.exists() and time.time() - path.stat().st_mtime < CACHE_MAX_AGE_S:
+        return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+
+    from nba_api.stats.endpoints import leaguegamefinder
+
+    finder = leaguegamefinder.LeagueGameFinder(
+        season_nullable=season,
+        league_id_nullable=LEAGUE_ID,
+        season_type_nullable=season_type
+    )
+    df = finder.get_data_frames()[0]
+    # ~30 team codes over thousands of rows: int codes for grouping/compares.
+    # Parquet stores this as a dictionary column, so cached reads keep the dtype.
+    df["TEAM_ABBREVIATION"] = df["TEAM_ABBREVIATION"].astype("category")
+
+    # The file keeps every column so any script can project from it
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
+    return df[list(columns)] if columns is not None else df
@@ -1,10 +1,41 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import orjson
 import os
+import random
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from postgrest.exceptions import APIError
 from supabase import create_client
 
+TABLE = "team_blowout_priors"
+ON_CONFLICT = "league,season,team_abbr"  # Composite unique key
+CHUNK_SIZE = 500      # PostgREST times out on very large single payloads
+MAX_WORKERS = 4
+MAX_ATTEMPTS = 5
+BACKOFF_START = 1.0   # Seconds; doubles per retry
+
+def is_retryable(e):
+    if isinstance(e, httpx.TransportError): return True  # Timeouts, dropped connections
+    # postgrest reports the HTTP status as the code when the error body isn't PostgREST JSON;
+    # 57014 is Postgres' statement timeout
+    code = str(e.code or "")
+    return code == "429" or (len(code) == 3 and code.startswith("5")) or code == "57014"
+
+def upsert_chunk(sb, chunk):
+    delay = BACKOFF_START
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return sb.table(TABLE).upsert(chunk, on_conflict=ON_CONFLICT).execute()
+        except (APIError, httpx.TransportError) as e:
+            if attempt == MAX_ATTEMPTS or not is_retryable(e): raise
+            print(f"Upsert of {len(chunk)} rows failed ({type(e).__name__}: {e}); retrying in {delay:.1f}s")
+            time.sleep(delay * random.uniform(1.0, 1.5))
+            delay *= 2
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("file", help="Path to blowout_priors_XXXX.json")
@@ -20,8 +51,8 @@ def main():
         print(f"Error: File {args.file} not found")
         sys.exit(1)
 
-    with open(args.file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(args.file, "rb") as f:
+        data = orjson.loads(f.read())
 
     sb = create_client(url, key)
     rows = []
@@ -42,11 +73,9 @@ def main():
         })
 
     if rows:
-        # Upsert using composite unique key
-        res = sb.table("team_blowout_priors").upsert(
-            rows, 
-            on_conflict="league,season,team_abbr"
-        ).execute()
+        chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+        with ThreadPoolExecutor(MAX_WORKERS) as ex:
+            list(ex.map(lambda c: upsert_chunk(sb, c), chunks))
         print(f"Successfully uploaded {len(rows)} rows from {args.file}.")
     else:
         print("No priors found in JSON.")